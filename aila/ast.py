@@ -1,9 +1,79 @@
-from dataclasses import dataclass
-from typing import List
+from array import array
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
 
-@dataclass
-class AilaCommand:
+# A numeric literal argument, pre-converted by the parser (None if not a number).
+Number = Optional[Union[int, float]]
+
+class AilaCommand(NamedTuple):
     """Represents a single command in an Aila program."""
     name: str
-    args: List[str]
+    args: Tuple[str, ...]
     line_number: int
+    # str.format_map templates for the args, set when any arg references a $variable
+    templates: Optional[Tuple[str, ...]] = None
+    # Args pre-converted to numbers, set for static arguments of numeric commands
+    typed_args: Optional[Tuple[Number, ...]] = None
+    # " ".join(args), precomputed for static arguments of text commands; for
+    # `window` and `button`, an empty join is replaced by the default text
+    joined: Optional[str] = None
+
+
+class ParsedProgram:
+    """
+    A parsed Aila program stored as parallel columns (structure of arrays).
+    Command names, argument tuples and line numbers live in separate lists so
+    passes that only need one column (validation, formatting) never build a
+    per-command object. Indexing or iterating yields AilaCommand views.
+    Syntax errors for lines that could not be parsed are kept in `errors`.
+    """
+    __slots__ = ("names", "args", "lines", "templates", "typed_args", "joined", "errors")
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.args: List[Tuple[str, ...]] = []
+        self.lines = array("i")
+        self.templates: List[Optional[Tuple[str, ...]]] = []
+        self.typed_args: List[Optional[Tuple[Number, ...]]] = []
+        self.joined: List[Optional[str]] = []
+        self.errors: List[str] = []
+
+    def append(
+        self,
+        name: str,
+        args: Tuple[str, ...],
+        line_number: int,
+        templates: Optional[Tuple[str, ...]] = None,
+        typed_args: Optional[Tuple[Number, ...]] = None,
+        joined: Optional[str] = None,
+    ) -> None:
+        self.names.append(name)
+        self.args.append(args)
+        self.lines.append(line_number)
+        self.templates.append(templates)
+        self.typed_args.append(typed_args)
+        self.joined.append(joined)
+
+    def get(self, index: int) -> AilaCommand:
+        """Builds an AilaCommand view of the command at `index`."""
+        return AilaCommand(
+            self.names[index],
+            self.args[index],
+            self.lines[index],
+            self.templates[index],
+            self.typed_args[index],
+            self.joined[index],
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, index: int) -> AilaCommand:
+        return self.get(index)
+
+    def __iter__(self) -> Iterator[AilaCommand]:
+        columns = zip(self.names, self.args, self.lines, self.templates, self.typed_args, self.joined)
+        for name, args, line_number, templates, typed_args, joined in columns:
+            yield AilaCommand(name, args, line_number, templates, typed_args, joined)
+
+    def __repr__(self) -> str:
+        return f"ParsedProgram({list(self)!r})"
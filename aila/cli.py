@@ -1,19 +1,36 @@
 import os
 import sys
+import glob
 import time
+import io
+import re
 import pprint
-import tempfile
-import subprocess
-from google import genai
+import functools
+import signal
+import builtins
+import threading
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
 from argparse import ArgumentParser
-import ollama
-import hashlib
-from tenacity import Retrying, stop_after_attempt, wait_fixed
+from typing import TYPE_CHECKING
+import blake3
+from .ast import ParsedProgram
 from .parser import Parser
+from .codegen import compile_aila_native
+
+if TYPE_CHECKING:
+    import sqlite3
 
 __version__ = "3.0.0"
 MODEL = "gemini-2.5-flash"
 CACHE_DIR = ".aila_cache"
+CACHE_DB = "cache.db"
+EXEC_TIMEOUT = 20
+
+# Modules that generated programs may import, and builtins removed from their
+# namespace, when run with --in-process.
+SANDBOX_MODULES = frozenset({"aila.gui", "time"})
+SANDBOX_BLOCKED_BUILTINS = frozenset({"open", "eval", "exec", "compile"})
 
 class Colors:
     """A simple class for printing colored text to the terminal."""
@@ -27,9 +44,17 @@ class Colors:
         self.FAIL = '\033[91m' if enabled else ''
         self.ENDC = '\033[0m' if enabled else ''
         self.BOLD = '\033[1m' if enabled else ''
+        self._endc_nl = self.ENDC + "\n"
+        if not enabled:
+            # Nothing to wrap, so skip the color writes entirely.
+            self.header = self.blue = self.cyan = self.green = print
+            self.warn = self.fail = self.bold = print
 
     def _print(self, color, text):
-        print(f"{color}{text}{self.ENDC}")
+        out = sys.stdout
+        out.write(color)
+        out.write(text)
+        out.write(self._endc_nl)
 
     def header(self, text): self._print(self.HEADER, text)
     def blue(self, text): self._print(self.OKBLUE, text)
@@ -40,7 +65,9 @@ class Colors:
     def bold(self, text): self._print(self.BOLD, text)
     def plain(self, text): print(text)
 
-PROMPT_TEMPLATE = """
+# Static compiler instructions, shared by every request. Kept separate from the
+# per-call user message so batch prompts can reuse them.
+SYSTEM_PROMPT = """
 You are Aila 3.0's compiler. Your sole purpose is to translate the user's Aila code into safe, sandboxed Python 3 code. You must only generate code for the commands present in the user's input.
 
 **GUI INSTRUCTIONS:**
@@ -126,7 +153,11 @@ You are Aila 3.0's compiler. Your sole purpose is to translate the user's Aila c
 - `start`: Starts the GUI event loop. This must be the last command for a GUI app.
   - Aila: `start`
   - Python: `gui.start()`
+"""
 
+# Per-call user message. The Aila code stays at the very end so the static
+# prefix above is byte-identical across requests.
+USER_PROMPT_TEMPLATE = """
 **USER'S AILA CODE (INPUT):**
 ```
 {aila_code}
@@ -135,6 +166,33 @@ You are Aila 3.0's compiler. Your sole purpose is to translate the user's Aila c
 **YOUR PYTHON 3 CODE (OUTPUT):**
 """
 
+PROMPT_TEMPLATE = SYSTEM_PROMPT + USER_PROMPT_TEMPLATE
+
+# Split the templates around the code slot once, so building a prompt is plain
+# concatenation rather than a str.format parse of the whole template.
+assert PROMPT_TEMPLATE.count("{aila_code}") == 1
+_PT_HEAD, _PT_TAIL = PROMPT_TEMPLATE.split("{aila_code}")
+_USER_HEAD, _USER_TAIL = USER_PROMPT_TEMPLATE.split("{aila_code}")
+
+# Prepended to the user message when several programs are compiled in one request.
+BATCH_INSTRUCTIONS = """
+**BATCH MODE:**
+- The input contains several independent Aila programs. Each one starts with a line `<<<FILE path>>>`.
+- Compile each program separately, following all of the rules above.
+- For each program, output a line `<<<OUT path>>>` with the same path, followed by that program's Python code.
+- Output nothing else.
+"""
+_FENCE_RE = re.compile(r"```(?:python)?")
+_BATCH_OUT_RE = re.compile(r'<<<OUT (.+?)>>>[ \t]*\r?\n')
+
+def build_prompt(aila_code: str) -> str:
+    """Builds the full compiler prompt for a piece of Aila code."""
+    return _PT_HEAD + aila_code + _PT_TAIL
+
+def build_user_prompt(aila_code: str) -> str:
+    """Builds the per-call user message that follows SYSTEM_PROMPT."""
+    return _USER_HEAD + aila_code + _USER_TAIL
+
 def lint_code(code: str, colors: Colors) -> bool:
     """Checks if the generated code is valid Python syntax."""
     try:
@@ -145,13 +203,17 @@ def lint_code(code: str, colors: Colors) -> bool:
         colors.plain(str(e))
         return False
 
+FORBIDDEN_KEYWORDS = [
+    "import os", "import sys", "subprocess", "socket", "urllib",
+    "open(", "eval(", "exec(", "ctypes", "shutil"
+]
+# All keywords in one alternation, so the code is scanned once instead of once per keyword.
+_FORBIDDEN_RE = re.compile("|".join(map(re.escape, FORBIDDEN_KEYWORDS)))
+
 def check_safety(code: str, colors: Colors) -> bool:
     """Scans generated code for forbidden keywords."""
-    forbidden_keywords = [
-        "import os", "import sys", "subprocess", "socket", "urllib",
-        "open(", "eval(", "exec(", "ctypes", "shutil"
-    ]
-    violations = [kw for kw in forbidden_keywords if kw in code]
+    found = {match.group(0) for match in _FORBIDDEN_RE.finditer(code)}
+    violations = [kw for kw in FORBIDDEN_KEYWORDS if kw in found]
     if violations:
         colors.fail("\n[Safety Violation] Generated code contains forbidden keywords:")
         for v in violations:
@@ -159,61 +221,180 @@ def check_safety(code: str, colors: Colors) -> bool:
         return False
     return True
 
+def strip_fences(text: str) -> str:
+    """Removes markdown code fences the model may have added despite the instructions."""
+    text = text.strip()
+    # Most responses honor the no-fences rule, so avoid the regex pass when there are none.
+    if "```" in text:
+        text = _FENCE_RE.sub("", text).strip()
+    return text
+
+@functools.lru_cache(maxsize=None)
 def get_client(timeout: int):
+    """Returns a Gemini client, reused for the lifetime of the process."""
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         print("Error: GEMINI_API_KEY not set in environment!")
         sys.exit(1)
+    from google import genai
+
     return genai.Client(api_key=api_key, http_options={"timeout": timeout})
 
-def compile_aila(aila_code: str, client) -> str:
-    """Send Aila code to Gemini to generate Python code with strict guardrails."""
-    prompt = PROMPT_TEMPLATE.format(aila_code=aila_code)
+def generate_gemini(user_prompt: str, client) -> str:
+    """Streams a completion for SYSTEM_PROMPT followed by `user_prompt`."""
     response = client.models.generate_content_stream(
         model=MODEL,
-        contents=prompt,
+        contents=SYSTEM_PROMPT + user_prompt,
     )
 
-    full_response = ""
+    chunks = []
     for chunk in response:
-        full_response += chunk.text
+        if chunk.text:
+            chunks.append(chunk.text)
+    return "".join(chunks)
 
-    code = full_response.strip()
-    code = code.replace('```python', '').replace('```', '')
-    return code.strip()
+def compile_aila(aila_code: str, client) -> str:
+    """Send Aila code to Gemini to generate Python code with strict guardrails."""
+    full_response = generate_gemini(build_user_prompt(aila_code), client)
+    return strip_fences(full_response)
 
 def compile_aila_ollama(aila_code: str, model: str, timeout: int) -> str:
     """Use a local Ollama model to translate Aila to Python with the same guardrails."""
-    prompt = PROMPT_TEMPLATE.format(aila_code=aila_code)
+    import ollama
+
+    prompt = build_prompt(aila_code)
     options = {"timeout": timeout}
     result = ollama.generate(model=model, prompt=prompt, options=options)
-    code = (result.get("response") or "").strip()
-    code = code.replace('```python', '').replace('```', '')
-    return code.strip()
+    return strip_fences(result.get("response") or "")
+
+async def compile_aila_ollama_async(aila_codes: list[str], model: str, timeout: int) -> list[str | Exception]:
+    """
+    Compile several Aila programs concurrently against a local Ollama server.
+    A request that fails yields its exception in place of the code, so one
+    failure doesn't discard the other results.
+    """
+    import asyncio
+    import ollama
+
+    client = ollama.AsyncClient()
+    options = {"timeout": timeout}
+    results = await asyncio.gather(*[
+        client.generate(model=model, prompt=build_prompt(aila_code), options=options)
+        for aila_code in aila_codes
+    ], return_exceptions=True)
+    return [
+        result if isinstance(result, Exception) else strip_fences(result.get("response") or "")
+        for result in results
+    ]
 
 
-def get_cache_key(data: str) -> str:
-    """Computes the SHA256 hash of a string to use as a cache key."""
-    return hashlib.sha256(data.encode()).hexdigest()
+def build_batch_prompt(sources: dict[str, str]) -> str:
+    """Builds the user prompt for compiling several programs in one request."""
+    joined = "\n".join(f"<<<FILE {path}>>>\n{source}" for path, source in sources.items())
+    return BATCH_INSTRUCTIONS + build_user_prompt(joined)
+
+def split_batch_output(response: str) -> dict[str, str]:
+    """Splits a batch response into {path: python_code} using its <<<OUT path>>> markers."""
+    parts = _BATCH_OUT_RE.split(response)
+    outputs = {}
+    # parts[0] is anything before the first marker; the rest alternates path, code.
+    for path, code in zip(parts[1::2], parts[2::2]):
+        outputs[path.strip()] = strip_fences(code)
+    return outputs
+
+def compile_aila_batch(sources: dict[str, str], client) -> dict[str, str]:
+    """Compile several Aila programs with a single Gemini request."""
+    return split_batch_output(generate_gemini(build_batch_prompt(sources), client))
+
+def compile_aila_batch_ollama(sources: dict[str, str], model: str, timeout: int) -> dict[str, str]:
+    """Compile several Aila programs with a single local Ollama request."""
+    import ollama
+
+    prompt = SYSTEM_PROMPT + build_batch_prompt(sources)
+    result = ollama.generate(model=model, prompt=prompt, options={"timeout": timeout})
+    return split_batch_output(result.get("response") or "")
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_file(path: str, mtime_ns: int, size: int) -> tuple[str, ParsedProgram]:
+    with open(path, "r") as f:
+        source = f.read()
+    return source, Parser(source).parse()
+
+def parse_file(path: str) -> tuple[str, ParsedProgram]:
+    """
+    Reads and parses an Aila file, returning (source, ast).
+    Memoized on (path, mtime_ns, size) so commands that look at the same
+    unchanged file share a single parse.
+    """
+    st = os.stat(path)
+    return _parse_file(path, st.st_mtime_ns, st.st_size)
+
+
+def get_cache_key(data: bytes) -> str:
+    """Computes the BLAKE3 hash of the source bytes to use as a cache key."""
+    return blake3.blake3(data).hexdigest()
+
+@functools.lru_cache(maxsize=None)
+def _cache_db(cache_dir: str) -> "sqlite3.Connection":
+    """Opens the cache database in cache_dir, creating it if needed (once per process)."""
+    import sqlite3
+
+    os.makedirs(cache_dir, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(cache_dir, CACHE_DB), isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, py_code BLOB, created_at INTEGER)")
+    return conn
 
 def save_to_cache(cache_dir: str, key: str, content: str):
-    """Saves content to a file in the cache directory."""
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
-    cache_path = os.path.join(cache_dir, key)
-    with open(cache_path, "w") as f:
-        f.write(content)
+    """Saves content to the cache database."""
+    _cache_db(cache_dir).execute(
+        "INSERT OR REPLACE INTO cache VALUES (?, ?, strftime('%s', 'now'))", (key, content)
+    )
 
 def load_from_cache(cache_dir: str, key: str) -> str | None:
-    """Loads content from a file in the cache directory if it exists."""
-    cache_path = os.path.join(cache_dir, key)
-    if os.path.exists(cache_path):
-        with open(cache_path, "r") as f:
-            return f.read()
-    return None
+    """Loads content from the cache database if it exists."""
+    row = _cache_db(cache_dir).execute("SELECT py_code FROM cache WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+def remove_from_cache(cache_dir: str, key: str):
+    """Removes an entry from the cache database."""
+    _cache_db(cache_dir).execute("DELETE FROM cache WHERE key = ?", (key,))
+
+
+class ExecutionTimeout(BaseException):
+    """Raised inside in-process programs that exceed EXEC_TIMEOUT.
+
+    Derives from BaseException so the generated `except Exception` wrapper cannot swallow it.
+    """
+
+def _raise_timeout(signum, frame):
+    raise ExecutionTimeout()
+
+def _sandbox_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level != 0 or name not in SANDBOX_MODULES:
+        raise ImportError(f"Import of '{name}' is not allowed in Aila programs")
+    return builtins.__import__(name, globals, locals, fromlist, level)
+
+def make_sandbox_globals() -> dict:
+    """
+    Builds a fresh global namespace with the standard builtins, minus the
+    blocked ones, and an __import__ restricted to SANDBOX_MODULES.
+    This guards against mistakes in generated code; it is not a security boundary.
+    """
+    sandbox_builtins = {
+        name: value for name, value in vars(builtins).items()
+        if name not in SANDBOX_BLOCKED_BUILTINS
+    }
+    sandbox_builtins["__import__"] = _sandbox_import
+    return {"__builtins__": sandbox_builtins, "__name__": "__aila__"}
 
+def run_python_isolated(code: str) -> str:
+    """Runs code in a separate python3 process."""
+    import subprocess
+    import tempfile
 
-def run_python(code: str) -> str:
     try:
         with tempfile.NamedTemporaryFile("w", delete=False, suffix=".py") as tmp:
             tmp.write(code)
@@ -222,48 +403,253 @@ def run_python(code: str) -> str:
             ["python3", tmp_path],
             capture_output=True,
             text=True,
-            timeout=20
+            timeout=EXEC_TIMEOUT
         )
         os.remove(tmp_path)
         return result.stdout + result.stderr
     except Exception as e:
         return f"Error running code: {e}"
 
+def run_python(code: str, in_process: bool = False, worker: "PythonWorker | None" = None) -> str:
+    """
+    Runs generated code and returns its output. By default the code runs in a
+    separate python3 process; `in_process` and `worker` opt into faster runners.
+    """
+    if worker is not None:
+        return worker.run(code)
+    if in_process:
+        return run_python_in_process(code)
+    return run_python_isolated(code)
+
+def run_python_in_process(code: str) -> str:
+    """Runs code in this process in a restricted namespace and returns its output."""
+    output = io.StringIO()
+    # SIGALRM is only available on Unix, and only from the main thread.
+    use_alarm = hasattr(signal, "SIGALRM") and threading.current_thread() is threading.main_thread()
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.alarm(EXEC_TIMEOUT)
+    try:
+        with redirect_stdout(output), redirect_stderr(output):
+            exec(compile(code, "<aila>", "exec"), make_sandbox_globals())
+    except ExecutionTimeout:
+        output.write(f"Error running code: timed out after {EXEC_TIMEOUT} seconds\n")
+    except SystemExit as e:
+        # Mirror the interpreter: exit quietly, printing a non-integer exit code.
+        if e.code is not None and not isinstance(e.code, int):
+            output.write(f"{e.code}\n")
+    except Exception:
+        output.write(traceback.format_exc())
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+            signal.signal(signal.SIGALRM, previous_handler)
+    return output.getvalue()
+
+def _worker_main(conn) -> None:
+    """Worker loop: runs each received program in a fresh sandbox until sent None."""
+    while True:
+        code = conn.recv()
+        if code is None:
+            break
+        conn.send(run_python_in_process(code))
+
+class PythonWorker:
+    """
+    A long-lived process that runs generated programs one after another.
+    Uses a forkserver (where available) preloaded with the Aila runtime, so
+    interpreter startup and imports are paid once rather than per program.
+    """
+
+    def __init__(self) -> None:
+        import multiprocessing
+
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            self._ctx = multiprocessing.get_context("forkserver")
+            self._ctx.set_forkserver_preload(["aila.cli", "aila.gui", "time"])
+        else:
+            self._ctx = multiprocessing.get_context("spawn")
+        self._start()
+
+    def _start(self) -> None:
+        self._conn, child_conn = self._ctx.Pipe()
+        self._process = self._ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self._process.start()
+        child_conn.close()
+
+    def run(self, code: str) -> str:
+        """Runs code in the worker and returns its output, restarting the worker if it hangs or dies."""
+        try:
+            self._conn.send(code)
+            # The worker enforces EXEC_TIMEOUT itself; the margin covers IPC.
+            if self._conn.poll(EXEC_TIMEOUT + 5):
+                return self._conn.recv()
+            error = f"Error running code: worker did not respond within {EXEC_TIMEOUT} seconds"
+        except (EOFError, OSError) as e:
+            error = f"Error running code: worker exited unexpectedly ({e})"
+        self._process.kill()
+        self._process.join()
+        self._start()
+        return error
+
+    def close(self) -> None:
+        try:
+            self._conn.send(None)
+        except (EOFError, OSError):
+            pass
+        self._process.join(timeout=1)
+        if self._process.is_alive():
+            self._process.kill()
+        self._conn.close()
+
 
 from .interpreter import AilaInterpreter
 
+def compile_without_llm(args, source: str, ast: ParsedProgram) -> tuple[str | None, str | None, str | None]:
+    """
+    Tries to produce Python for a program without calling the LLM.
+    Returns (py_code, origin, cache_key), where origin is "trivial" (empty or
+    start/close only), "native" (validated cleanly and compiled by the code
+    generator) or "cache" (LLM output from an earlier run). py_code and origin
+    are None if the LLM is needed, including when some lines failed to parse:
+    the parsed program would silently omit them, so the LLM gets the whole
+    source instead. The source is only hashed once the cache is consulted, so
+    cache_key is None for trivial and native programs and with --no-cache.
+
+    Native output is cheap and deterministic, so it is tried before the cache
+    and never stored there; codegen fixes then reach warm caches too.
+    """
+    if not ast.errors:
+        if all(name in TRIVIAL_COMMANDS for name in ast.names):
+            return compile_aila_native(ast), "trivial", None
+        if not validate_ast(ast):
+            py_code = compile_aila_native(ast)
+            if py_code is not None:
+                return py_code, "native", None
+    if args.no_cache:
+        return None, None, None
+    cache_key = get_cache_key(source.encode())
+    py_code = load_from_cache(args.cache_dir, cache_key)
+    if py_code:
+        return py_code, "cache", cache_key
+    return None, None, cache_key
+
+def handle_run_batch(args, colors):
+    """Handles 'run --batch': compiles every .aila file in a directory concurrently via Ollama."""
+    if not args.local:
+        colors.fail("Error: --batch requires --local (batch compilation uses Ollama).")
+        sys.exit(1)
+    if args.code_out or args.dump_ast:
+        colors.fail("Error: --code-out and --dump-ast cannot be used with --batch.")
+        sys.exit(1)
+    if not os.path.isdir(args.batch):
+        colors.fail(f"Directory not found: {args.batch}")
+        sys.exit(1)
+
+    filenames = sorted(glob.glob(os.path.join(args.batch, "*.aila")))
+    if not filenames:
+        colors.warn(f"No .aila files found in {args.batch}")
+        return
+
+    sources = {}
+    cache_keys = {}
+    compiled = {}
+    fresh = {}
+    pending = []
+    from_cache = 0
+    for filename in filenames:
+        sources[filename], ast = parse_file(filename)
+        py_code, origin, cache_keys[filename] = compile_without_llm(args, sources[filename], ast)
+        if py_code is None:
+            pending.append(filename)
+        else:
+            compiled[filename] = py_code
+            from_cache += origin == "cache"
+
+    if from_cache:
+        colors.warn(f"\n[Cache] Loaded {from_cache} file(s) from cache.")
+    if len(compiled) > from_cache:
+        colors.blue(f"\n[Native] Compiled {len(compiled) - from_cache} file(s) without the LLM.")
+
+    if pending:
+        import asyncio
+
+        colors.blue(f"\n[Local] Compiling {len(pending)} file(s) via Ollama (model: {args.model}, timeout: {args.timeout}s)...")
+        try:
+            codes = asyncio.run(compile_aila_ollama_async([sources[f] for f in pending], args.model, args.timeout))
+        except Exception as e:
+            # e.g. the Ollama client could not be created; every pending file fails alike
+            codes = [e] * len(pending)
+        for filename, result in zip(pending, codes):
+            if isinstance(result, Exception):
+                colors.fail(f"\n[{filename}] Compilation failed: {result}")
+            elif not result:
+                colors.fail(f"\n[{filename}] No code was generated for this file.")
+            else:
+                fresh[filename] = result
+
+    for filename, py_code in fresh.items():
+        if not lint_code(py_code, colors) or not check_safety(py_code, colors):
+            colors.fail(f"\n[{filename}] Compilation failed due to linting or safety violations.")
+            continue
+        compiled[filename] = py_code
+        if not args.no_cache:
+            save_to_cache(args.cache_dir, cache_keys[filename], py_code)
+
+    worker = PythonWorker() if args.worker and not args.dry_run else None
+    try:
+        for filename in filenames:
+            if filename not in compiled:
+                continue
+            colors.bold(f"\n=== {filename} ===")
+            if args.dry_run:
+                colors.cyan(compiled[filename])
+                continue
+            colors.plain(run_python(compiled[filename], in_process=args.in_process, worker=worker))
+    finally:
+        if worker is not None:
+            worker.close()
+
+    if len(compiled) != len(filenames):
+        sys.exit(1)
+
 def handle_run(args, colors):
     """Handles the 'run' command."""
+    if args.batch:
+        handle_run_batch(args, colors)
+        return
+
     start_time = time.time()
     filename = args.filename
+    if not filename:
+        colors.fail("Error: a filename is required unless --batch is given.")
+        sys.exit(1)
     if not os.path.exists(filename):
         colors.fail(f"File not found: {filename}")
         sys.exit(1)
 
-    with open(filename, "r") as f:
-        aila_code = f.read()
+    aila_code, ast = parse_file(filename)
 
     colors.bold("=== Aila Code ===")
     colors.plain(aila_code)
 
     if args.dump_ast:
         colors.header("\n--- Abstract Syntax Tree ---")
-        parser = Parser(aila_code)
-        ast = parser.parse()
-        pprint.pprint(ast)
+        pprint.pprint(list(ast))
         sys.exit(0)
 
-    py_code = None
-    cache_key = get_cache_key(aila_code)
     compilation_time = 0
-
-    if not args.no_cache:
-        py_code = load_from_cache(args.cache_dir, cache_key)
-        if py_code:
-            colors.warn("\n[Cache] Loaded from cache.")
-
-    if py_code is None:
-        compile_start_time = time.time()
+    compile_start_time = time.time()
+    py_code, origin, cache_key = compile_without_llm(args, aila_code, ast)
+
+    if origin == "trivial":
+        colors.blue("\n[Native] Trivial program; emitted stub without compiling.")
+    elif origin == "cache":
+        colors.warn("\n[Cache] Loaded from cache.")
+    elif origin == "native":
+        colors.blue("\n[Native] Program validated cleanly; compiled without the LLM.")
+    else:
+        from tenacity import Retrying, stop_after_attempt, wait_fixed
 
         retryer = Retrying(
             stop=stop_after_attempt(args.retries),
@@ -289,6 +675,7 @@ def handle_run(args, colors):
             colors.warn("\nYou can try increasing the timeout and retries with the --timeout and --retries flags.")
             py_code = None # Ensure py_code is None on failure
 
+    if origin is None:
         compilation_time = time.time() - compile_start_time
 
         if py_code:
@@ -297,9 +684,7 @@ def handle_run(args, colors):
                 colors.fail("\nCompilation failed due to linting or safety violations.")
                 # Invalidate the cache if the generated code was bad
                 if not args.no_cache:
-                    cache_path = os.path.join(args.cache_dir, cache_key)
-                    if os.path.exists(cache_path):
-                        os.remove(cache_path)
+                    remove_from_cache(args.cache_dir, cache_key)
                 sys.exit(1)
 
             if not args.no_cache:
@@ -328,7 +713,12 @@ def handle_run(args, colors):
 
     colors.bold("\n[Python] Executing...")
     exec_start_time = time.time()
-    output = run_python(py_code)
+    worker = PythonWorker() if args.worker else None
+    try:
+        output = run_python(py_code, in_process=args.in_process, worker=worker)
+    finally:
+        if worker is not None:
+            worker.close()
     exec_time = time.time() - exec_start_time
 
     colors.plain(output)
@@ -341,6 +731,102 @@ def handle_run(args, colors):
         colors.plain(f"Total:         {time.time() - start_time:.2f}s")
 
 
+def output_paths(filenames: list[str], out_dir: str) -> dict[str, str]:
+    """
+    Maps each input file to a .py path in out_dir, mirroring its location
+    relative to the inputs' common directory so same-named files don't collide.
+    """
+    absolute = {filename: os.path.abspath(filename) for filename in filenames}
+    base = os.path.commonpath([os.path.dirname(path) for path in absolute.values()])
+    return {
+        filename: os.path.join(out_dir, os.path.splitext(os.path.relpath(path, base))[0] + ".py")
+        for filename, path in absolute.items()
+    }
+
+def handle_compile(args, colors):
+    """Handles the 'compile' command."""
+    sources = {}
+    cache_keys = {}
+    compiled = {}
+    fresh = {}
+    pending = {}
+    from_cache = 0
+    for filename in args.files:
+        if not os.path.exists(filename):
+            colors.fail(f"File not found: {filename}")
+            sys.exit(1)
+        source, ast = parse_file(filename)
+        sources[filename] = source
+        py_code, origin, cache_keys[filename] = compile_without_llm(args, source, ast)
+        if py_code is None:
+            pending[filename] = source
+        else:
+            compiled[filename] = py_code
+            from_cache += origin == "cache"
+
+    if from_cache:
+        colors.warn(f"\n[Cache] Loaded {from_cache} file(s) from cache.")
+    if len(compiled) > from_cache:
+        colors.blue(f"\n[Native] Compiled {len(compiled) - from_cache} file(s) without the LLM.")
+
+    if pending:
+        backend = f"Ollama (model: {args.model})" if args.local else "Gemini"
+        batch = args.batch and len(pending) > 1
+        try:
+            if not args.local:
+                client = get_client(timeout=args.timeout)
+            if batch:
+                colors.blue(f"\n[Batch] Compiling {len(pending)} file(s) in one request via {backend}...")
+                if args.local:
+                    results = compile_aila_batch_ollama(pending, args.model, args.timeout)
+                else:
+                    results = compile_aila_batch(pending, client)
+            else:
+                colors.blue(f"\n[Aila -> Python] Compiling {len(pending)} file(s) via {backend}...")
+                results = {}
+                for filename, source in pending.items():
+                    if args.local:
+                        results[filename] = compile_aila_ollama(source, args.model, args.timeout)
+                    else:
+                        results[filename] = compile_aila(source, client)
+        except Exception as e:
+            colors.fail(f"\nAPI call failed: {e}")
+            sys.exit(1)
+
+        for filename in pending:
+            if results.get(filename):
+                fresh[filename] = results[filename]
+            else:
+                colors.fail(f"\n[{filename}] No code was generated for this file.")
+
+    for filename, py_code in fresh.items():
+        if not lint_code(py_code, colors) or not check_safety(py_code, colors):
+            colors.fail(f"\n[{filename}] Compilation failed due to linting or safety violations.")
+            continue
+        compiled[filename] = py_code
+        if not args.no_cache:
+            save_to_cache(args.cache_dir, cache_keys[filename], py_code)
+
+    out_paths = output_paths(list(sources), args.out_dir) if args.out_dir else {}
+    for filename in sources:
+        if filename not in compiled:
+            continue
+        colors.bold(f"\n=== {filename} ===")
+        colors.cyan(compiled[filename])
+        if args.out_dir:
+            out_path = out_paths[filename]
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            try:
+                with open(out_path, "w") as f:
+                    f.write(compiled[filename])
+                colors.green(f"[Code Out] Saved generated Python to {out_path}")
+            except IOError as e:
+                colors.fail(f"Error writing to {out_path}: {e}")
+                sys.exit(1)
+
+    if len(compiled) != len(sources):
+        sys.exit(1)
+
 def handle_interpret(args, colors):
     """Handles the 'interpret' command."""
     filename = args.filename
@@ -401,6 +887,8 @@ def handle_doctor(args, colors):
     # Check for Ollama Connection
     colors.bold("\n[2] Ollama (Local) Check:")
     try:
+        import ollama
+
         # We can use the ollama.ps() command as a lightweight way to check the connection
         response = ollama.ps()
         colors.green("  - Ollama connection successful.")
@@ -419,51 +907,59 @@ def handle_doctor(args, colors):
         if args.verbose > 0:
             colors.plain(f"    Error: {e}")
 
-    colors.bold("\nDoctor's report complete.")
+    # Compact the compilation cache
+    import sqlite3
 
-def handle_validate(args, colors):
-    """Handles the 'validate' command."""
-    colors.bold(f"--- Validating {args.filename} ---")
-    filename = args.filename
-    if not os.path.exists(filename):
-        colors.fail(f"File not found: {filename}")
-        sys.exit(1)
+    colors.bold("\n[3] Cache Check:")
+    if os.path.exists(os.path.join(args.cache_dir, CACHE_DB)):
+        try:
+            conn = _cache_db(args.cache_dir)
+            (entries,) = conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+            conn.execute("VACUUM")
+            colors.green(f"  - Cache database OK ({entries} entries), compacted.")
+        except sqlite3.Error as e:
+            colors.fail("  - Cache database could not be read.")
+            if args.verbose > 0:
+                colors.plain(f"    Error: {e}")
+    else:
+        colors.plain(f"  - No cache found in {args.cache_dir}.")
 
-    with open(filename, "r") as f:
-        aila_code = f.read()
+    colors.bold("\nDoctor's report complete.")
 
-    parser = Parser(aila_code)
-    ast = parser.parse()
+# Define command specifications: {command: (min_args, max_args)}
+# Use float('inf') for no upper limit.
+COMMAND_SPECS = {
+    "say": (1, float('inf')),
+    "repeat": (2, float('inf')),
+    "wait": (1, 1),
+    "window": (1, float('inf')),
+    "label": (1, float('inf')),
+    "input": (0, float('inf')),
+    "button": (1, float('inf')),
+    "show": (1, float('inf')),
+    "start": (0, 0),
+    "close": (0, 0),
+    # New variable and math commands
+    "set": (2, 2),
+    "add": (2, 2),
+    "sub": (2, 2),
+    "mul": (2, 2),
+    "div": (2, 2),
+}
+
+# Commands that on their own make up a program with nothing to compile.
+TRIVIAL_COMMANDS = frozenset({"start", "close"})
+
+def validate_ast(ast: ParsedProgram) -> list[str]:
+    """Checks parsed commands against COMMAND_SPECS and returns a list of error messages."""
     errors = []
-
-    # Define command specifications: {command: (min_args, max_args)}
-    # Use float('inf') for no upper limit.
-    COMMAND_SPECS = {
-        "say": (1, float('inf')),
-        "repeat": (2, float('inf')),
-        "wait": (1, 1),
-        "window": (1, float('inf')),
-        "label": (1, float('inf')),
-        "input": (0, float('inf')),
-        "button": (1, float('inf')),
-        "show": (1, float('inf')),
-        "start": (0, 0),
-        "close": (0, 0),
-        # New variable and math commands
-        "set": (2, 2),
-        "add": (2, 2),
-        "sub": (2, 2),
-        "mul": (2, 2),
-        "div": (2, 2),
-    }
-
-    for command in ast:
-        if command.name not in COMMAND_SPECS:
-            errors.append(f"L{command.line_number}: Unknown command '{command.name}'")
+    for name, args, line_number in zip(ast.names, ast.args, ast.lines):
+        if name not in COMMAND_SPECS:
+            errors.append(f"L{line_number}: Unknown command '{name}'")
             continue
 
-        min_args, max_args = COMMAND_SPECS[command.name]
-        num_args = len(command.args)
+        min_args, max_args = COMMAND_SPECS[name]
+        num_args = len(args)
 
         if not (min_args <= num_args <= max_args):
             if min_args == max_args:
@@ -472,7 +968,19 @@ def handle_validate(args, colors):
                 expected = f"at least {min_args} arguments"
             else:
                 expected = f"between {min_args} and {max_args} arguments"
-            errors.append(f"L{command.line_number}: Command '{command.name}' expects {expected}, but got {num_args}")
+            errors.append(f"L{line_number}: Command '{name}' expects {expected}, but got {num_args}")
+    return errors
+
+def handle_validate(args, colors):
+    """Handles the 'validate' command."""
+    colors.bold(f"--- Validating {args.filename} ---")
+    filename = args.filename
+    if not os.path.exists(filename):
+        colors.fail(f"File not found: {filename}")
+        sys.exit(1)
+
+    _, ast = parse_file(filename)
+    errors = validate_ast(ast)
 
     if errors:
         colors.fail("\nValidation failed with the following errors:")
@@ -490,21 +998,15 @@ def handle_fmt(args, colors):
         colors.fail(f"File not found: {filename}")
         sys.exit(1)
 
-    with open(filename, "r") as f:
-        original_content = f.read()
-
-    parser = Parser(original_content)
-    ast = parser.parse()
+    original_content, ast = parse_file(filename)
 
-    formatted_lines = []
-    for command in ast:
-        formatted_lines.append(f"{command.name} {' '.join(command.args)}")
-
-    # Add a trailing newline
-    formatted_content = "\n".join(formatted_lines) + "\n"
+    formatted_lines = [f"{name} {' '.join(cmd_args)}\n" for name, cmd_args in zip(ast.names, ast.args)]
+    # An empty program formats to a single trailing newline
+    formatted_content = "".join(formatted_lines) or "\n"
+    is_formatted = formatted_content == original_content
 
     if args.check:
-        if original_content == formatted_content:
+        if is_formatted:
             colors.green(f"'{filename}' is already formatted.")
             sys.exit(0)
         else:
@@ -512,7 +1014,7 @@ def handle_fmt(args, colors):
             # To be more helpful, we could show a diff here in a future version
             sys.exit(1)
     else:
-        if original_content == formatted_content:
+        if is_formatted:
             colors.green(f"'{filename}' is already formatted. No changes made.")
         else:
             try:
@@ -532,13 +1034,26 @@ def main():
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
     # Run command
-    run_parser = subparsers.add_parser("run", help="Compile and run an Aila program")
-    run_parser.add_argument("filename", help="Path to .aila program")
+    run_parser = subparsers.add_parser(
+        "run",
+        help="Compile and run an Aila program",
+        epilog=(
+            "Batch compiles (--batch --local) send all requests to Ollama concurrently. "
+            "Set OLLAMA_NUM_PARALLEL on the Ollama server to control how many requests it "
+            "serves in parallel, and OLLAMA_MAX_LOADED_MODELS to control how many models it "
+            "keeps loaded at once."
+        ),
+    )
+    run_parser.add_argument("filename", nargs="?", help="Path to .aila program")
+    run_parser.add_argument("--batch", metavar="DIR", help="Compile and run every .aila file in DIR concurrently (requires --local)")
     run_parser.add_argument("--local", action="store_true", help="Compile with local Ollama model instead of Gemini")
     run_parser.add_argument("--model", default=os.getenv("OLLAMA_MODEL", "llama3.1"), help="The local model to use (requires --local)")
     run_parser.add_argument("--no-cache", action="store_true", help="Disable caching of compiled code")
     run_parser.add_argument("--cache-dir", default=CACHE_DIR, help=f"Directory to store cached code (default: {CACHE_DIR})")
     run_parser.add_argument("--dry-run", action="store_true", help="Compile the code but do not execute it")
+    exec_group = run_parser.add_mutually_exclusive_group()
+    exec_group.add_argument("--in-process", action="store_true", help="Execute the generated code inside the aila process instead of a separate Python process")
+    exec_group.add_argument("--worker", action="store_true", help="Execute the generated code in a persistent worker process (reused across --batch files)")
     run_parser.add_argument("--code-out", help="Save the generated Python code to a file")
     run_parser.add_argument("--dump-ast", action="store_true", help="Parse the Aila code and print the Abstract Syntax Tree")
     run_parser.add_argument("--timeout", type=int, default=60, help="Timeout for API calls in seconds")
@@ -546,6 +1061,18 @@ def main():
     run_parser.add_argument("--retry-delay", type=int, default=5, help="Delay between retries in seconds")
     run_parser.set_defaults(func=handle_run)
 
+    # Compile command
+    compile_parser = subparsers.add_parser("compile", help="Compile Aila programs to Python without running them")
+    compile_parser.add_argument("files", nargs="+", help="Paths to .aila programs")
+    compile_parser.add_argument("--batch", action="store_true", help="Send all files that need the LLM in a single request")
+    compile_parser.add_argument("--local", action="store_true", help="Compile with local Ollama model instead of Gemini")
+    compile_parser.add_argument("--model", default=os.getenv("OLLAMA_MODEL", "llama3.1"), help="The local model to use (requires --local)")
+    compile_parser.add_argument("--no-cache", action="store_true", help="Disable caching of compiled code")
+    compile_parser.add_argument("--cache-dir", default=CACHE_DIR, help=f"Directory to store cached code (default: {CACHE_DIR})")
+    compile_parser.add_argument("--out-dir", help="Write each generated Python program to this directory, mirroring the input files' relative paths")
+    compile_parser.add_argument("--timeout", type=int, default=60, help="Timeout for API calls in seconds")
+    compile_parser.set_defaults(func=handle_compile)
+
     # Interpret command
     interpret_parser = subparsers.add_parser("interpret", help="Execute an Aila program with the local interpreter")
     interpret_parser.add_argument("filename", help="Path to .aila program")
@@ -558,6 +1085,7 @@ def main():
 
     # Doctor command
     doctor_parser = subparsers.add_parser("doctor", help="Check your environment for issues")
+    doctor_parser.add_argument("--cache-dir", default=CACHE_DIR, help=f"Cache directory to check (default: {CACHE_DIR})")
     doctor_parser.set_defaults(func=handle_doctor)
 
     # Validate command
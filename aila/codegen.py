@@ -0,0 +1,216 @@
+import math
+from typing import List, Optional
+
+from .ast import AilaCommand, ParsedProgram
+from .parser import _VAR_RE, parse_number
+
+# Runtime helpers mirroring the interpreter's conversions. Only the ones a
+# program actually uses are emitted.
+_HELPERS = {
+    "_number": '''\
+def _number(value):
+    try:
+        return float(value) if "." in value else int(value)
+    except ValueError:
+        return None
+''',
+    "_value": '''\
+def _value(value):
+    number = _number(value)
+    return value if number is None else number
+''',
+    "_to_int": '''\
+def _to_int(value, default):
+    try:
+        return int(value)
+    except ValueError:
+        return default
+''',
+    "_to_float": '''\
+def _to_float(value, default):
+    try:
+        return float(value)
+    except ValueError:
+        return default
+''',
+}
+
+_ARITH_OPS = {"add": "+=", "sub": "-=", "mul": "*=", "div": "/="}
+_GUI_COMMANDS = ("window", "label", "input", "show", "start", "close")
+# Commands that need logic only the LLM can write (a button's on_click handler).
+_LLM_ONLY_COMMANDS = frozenset({"button"})
+
+
+def _literal(number: float | int) -> str:
+    """Returns a Python expression for a number; inf and nan have no literal form."""
+    if isinstance(number, float) and not math.isfinite(number):
+        return f"float({str(number)!r})"
+    return repr(number)
+
+
+class _Emitter:
+    """Walks a list of Aila commands and emits equivalent Python source."""
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.helpers: List[str] = []
+        self.window_created = False
+
+    def helper(self, name: str) -> str:
+        if name == "_value":
+            self.helper("_number")
+        if name not in self.helpers:
+            self.helpers.append(name)
+        return name
+
+    def emit(self, line: str, indent: int = 0) -> None:
+        self.lines.append("    " * indent + line)
+
+    def text(self, text: str) -> str:
+        """Returns a Python expression for `text` with `$var` references resolved at runtime."""
+        parts = []
+        pos = 0
+        for match in _VAR_RE.finditer(text):
+            if match.start() > pos:
+                parts.append(repr(text[pos:match.start()]))
+            parts.append(f"str(variables.get({match.group(1)!r}, {match.group(0)!r}))")
+            pos = match.end()
+        if pos < len(text):
+            parts.append(repr(text[pos:]))
+        return " + ".join(parts) or "''"
+
+    def require_window(self) -> None:
+        if not self.window_created:
+            self.emit('gui.create_window("Aila")')
+            self.window_created = True
+
+    def command(self, cmd: AilaCommand) -> bool:
+        """Emits code for one command. Returns False when nothing after it should run."""
+        joined = " ".join(cmd.args)
+        static = "$" not in joined
+
+        if cmd.name == "say":
+            self.emit(f"print({self.text(joined)})")
+
+        elif cmd.name == "set":
+            name, value = cmd.args
+            if "$" in value:
+                self.emit(f"variables[{self.text(name)}] = {self.helper('_value')}({self.text(value)})")
+            else:
+                number = parse_number(value)
+                self.emit(f"variables[{self.text(name)}] = {repr(value) if number is None else _literal(number)}")
+
+        elif cmd.name in _ARITH_OPS:
+            name, value = cmd.args
+            name_expr = self.text(name)
+            op = _ARITH_OPS[cmd.name]
+            not_found = f"L{cmd.line_number}: Variable '{{}}' not found."
+            not_number = f"L{cmd.line_number}: Second argument for '{cmd.name}' must be a number."
+            self.emit(f"if {name_expr} not in variables:")
+            if "$" in name:
+                self.emit(f"print({not_found!r}.format({name_expr}))", 1)
+            else:
+                self.emit(f"print({not_found.format(name)!r})", 1)
+            self.emit("else:")
+            if "$" in value:
+                self.emit(f"_operand = {self.helper('_number')}({self.text(value)})", 1)
+                self.emit("if _operand is None:", 1)
+                self.emit(f"print({not_number!r})", 2)
+                self.emit("else:", 1)
+                self.emit(f"variables[{name_expr}] {op} _operand", 2)
+            else:
+                number = parse_number(value)
+                if number is None:
+                    self.emit(f"print({not_number!r})", 1)
+                else:
+                    self.emit(f"variables[{name_expr}] {op} {_literal(number)}", 1)
+
+        elif cmd.name == "repeat":
+            count, text = cmd.args[0], " ".join(cmd.args[1:])
+            if "$" in count:
+                count_expr = f"{self.helper('_to_int')}({self.text(count)}, 1)"
+            else:
+                try:
+                    count_expr = repr(int(count))
+                except ValueError:
+                    count_expr = "1"
+            self.emit(f"for _ in range({count_expr}):")
+            self.emit(f"print({self.text(text)})", 1)
+
+        elif cmd.name == "wait":
+            seconds = cmd.args[0]
+            if "$" in seconds:
+                self.emit(f"time.sleep(max({self.helper('_to_float')}({self.text(seconds)}, 0.0), 0.0))")
+            else:
+                try:
+                    value = max(float(seconds), 0.0)
+                except ValueError:
+                    value = 0.0
+                self.emit(f"time.sleep({_literal(value)})")
+
+        elif cmd.name == "window":
+            title = repr(joined or "Aila") if static else f"({self.text(joined)}) or 'Aila'"
+            self.emit(f"gui.create_window({title})")
+            self.window_created = True
+
+        elif cmd.name == "label":
+            self.require_window()
+            self.emit(f"gui.label({self.text(joined)})")
+
+        elif cmd.name == "input":
+            self.require_window()
+            self.emit(f"gui.input({self.text(joined)})")
+
+        elif cmd.name == "show":
+            self.require_window()
+            self.emit(f"gui.show({self.text(joined)})")
+
+        elif cmd.name == "start":
+            self.require_window()
+            self.emit("gui.start()")
+            return False
+
+        elif cmd.name == "close":
+            self.emit("gui.close()")
+
+        else:
+            raise ValueError(f"L{cmd.line_number}: Unknown command '{cmd.name}'")
+
+        return True
+
+
+def compile_aila_native(ast: ParsedProgram) -> Optional[str]:
+    """
+    Deterministically translates a validated Aila AST into Python.
+    Returns None if the program uses a command the code generator does not know,
+    or a button, whose on_click logic is left to the LLM.
+    """
+    if not ast.names:
+        return "pass\n"
+    if any(name in _LLM_ONLY_COMMANDS for name in ast.names):
+        return None
+
+    emitter = _Emitter()
+    try:
+        for cmd in ast:
+            if not emitter.command(cmd):
+                break
+    except ValueError:
+        return None
+
+    header = []
+    if any(name in _GUI_COMMANDS for name in ast.names):
+        header += ["from aila.gui import AilaGUI", "gui = AilaGUI()"]
+    if "wait" in ast.names:
+        header.insert(0, "import time")
+    header.append("variables = {}")
+    for name in emitter.helpers:
+        header.append(_HELPERS[name])
+
+    body = emitter.lines or ["pass"]
+    return (
+        "\n".join(header)
+        + "\ntry:\n"
+        + "\n".join("    " + line for line in body)
+        + "\nexcept Exception as e:\n    print(e)\n"
+    )
@@ -1,10 +1,17 @@
-import tkinter as tk
-from tkinter import messagebox
-from typing import Callable, Optional
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    import tkinter as tk
 
 
 class AilaGUI:
-    """Minimal Tkinter-based GUI backend for Aila programs."""
+    """
+    Minimal Tkinter-based GUI backend for Aila programs.
+    tkinter is imported on first use, so programs that never open a window
+    do not pay for loading Tk.
+    """
 
     def __init__(self) -> None:
         self.root: Optional[tk.Tk] = None
@@ -14,6 +21,8 @@ class AilaGUI:
 
     def create_window(self, title: str = "Aila Window") -> None:
         if self.root is None:
+            import tkinter as tk
+
             self.root = tk.Tk()
             self.root.title(title)
         else:
@@ -22,6 +31,8 @@ class AilaGUI:
     def label(self, text: str) -> None:
         if not self.root:
             raise RuntimeError("Window not created. Call create_window first.")
+        import tkinter as tk
+
         lbl = tk.Label(self.root, text=text)
         lbl.pack(padx=8, pady=4, anchor="w")
         self._labels.append(lbl)
@@ -29,6 +40,8 @@ class AilaGUI:
     def input(self, default_text: str = "") -> tk.Entry:
         if not self.root:
             raise RuntimeError("Window not created. Call create_window first.")
+        import tkinter as tk
+
         entry = tk.Entry(self.root)
         if default_text:
             entry.insert(0, default_text)
@@ -39,11 +52,15 @@ class AilaGUI:
     def button(self, text: str, on_click: Optional[Callable[[], None]] = None) -> None:
         if not self.root:
             raise RuntimeError("Window not created. Call create_window first.")
+        import tkinter as tk
+
         btn = tk.Button(self.root, text=text, command=on_click)
         btn.pack(padx=8, pady=4)
         self._buttons.append(btn)
 
     def show(self, text: str) -> None:
+        from tkinter import messagebox
+
         messagebox.showinfo("Aila", text)
 
     def close(self) -> None:
@@ -1,136 +1,254 @@
-import time
-import re
-from typing import List, Any, Dict
+import sys
+import operator
+import functools
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Sequence, Tuple
 
-from .gui import AilaGUI
-from .parser import Parser
+from .ast import AilaCommand, ParsedProgram
+from .parser import Parser, parse_number
+
+if TYPE_CHECKING:
+    from .gui import AilaGUI
+
+# A command handler, called as `op(interpreter, cmd, args)`.
+Op = Callable[["AilaInterpreter", AilaCommand, Sequence[str]], Any]
+
+
+class _VariableLookup:
+    """Mapping view used by str.format_map; unknown names render as `$name`."""
+    __slots__ = ("variables",)
+
+    def __init__(self, variables: Dict[str, Any]) -> None:
+        self.variables = variables
+
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return self.variables[name]
+        except KeyError:
+            return "$" + name
+
+# Arithmetic commands and the in-place operator each one applies.
+_ARITH_OPS = {
+    "add": operator.iadd,
+    "sub": operator.isub,
+    "mul": operator.imul,
+    "div": operator.itruediv,
+}
+
+# Upper bound, in characters, on the output built for a single write by `repeat`.
+_WRITE_BLOCK_SIZE = 64 * 1024
+
+def _split_repeat(line: str, count: int) -> Tuple[str, int, str]:
+    """
+    Splits `count` copies of `line` into `(block, full_blocks, tail)`: `full_blocks`
+    writes of `block` followed by one of `tail`, each at most _WRITE_BLOCK_SIZE long.
+    """
+    per_block = max(_WRITE_BLOCK_SIZE // len(line), 1)
+    full_blocks, rest = divmod(max(count, 0), per_block)
+    return (line * per_block if full_blocks else ""), full_blocks, line * rest
+
+def _write_repeat(block: str, full_blocks: int, tail: str) -> None:
+    """Writes output split by _split_repeat: one write per block instead of one print per line."""
+    write = sys.stdout.write
+    for _ in range(full_blocks):
+        write(block)
+    if tail:
+        write(tail)
+
+def _noop() -> None:
+    """Shared click handler for buttons, which have no behavior in the interpreter."""
+
+
+# Returned by a command handler to stop executing the rest of the script.
+_STOP = object()
 
 
 class AilaInterpreter:
     """Simple line-oriented interpreter for the Aila language."""
 
     def __init__(self) -> None:
-        self.gui = AilaGUI()
+        # Created on first GUI command, so GUI-less scripts never import the backend.
+        self.gui: Optional["AilaGUI"] = None
         self.window_created = False
         self.variables: Dict[str, Any] = {}
+        self._lookup = _VariableLookup(self.variables)
+
+    def _require_gui(self) -> "AilaGUI":
+        if self.gui is None:
+            from .gui import AilaGUI
+            self.gui = AilaGUI()
+        return self.gui
 
     def _require_window(self) -> None:
         if not self.window_created:
-            self.gui.create_window("Aila")
+            self._require_gui().create_window("Aila")
             self.window_created = True
 
-    def _substitute_vars(self, args: List[str]) -> List[str]:
-        """Substitutes variable references in a list of arguments."""
-        substituted_args = []
-        for arg in args:
-            # Use a regex to find all occurrences of $varname
-            # and replace them using a lambda function.
-            def replace_match(match):
-                var_name = match.group(1)
-                return str(self.variables.get(var_name, f"${var_name}"))
+    def _substitute_vars(self, cmd: AilaCommand) -> Sequence[str]:
+        """Returns the command's arguments with variable references substituted."""
+        if cmd.templates is None:
+            return cmd.args
+        lookup = self._lookup
+        format_map = str.format_map
+        return [format_map(template, lookup) for template in cmd.templates]
 
-            substituted_arg = re.sub(r'\$([a-zA-Z_][a-zA-Z0-9_]*)', replace_match, arg)
-            substituted_args.append(substituted_arg)
-        return substituted_args
+    def _text(self, cmd: AilaCommand, args: Sequence[str]) -> str:
+        """Returns the arguments joined into one string, reusing the parser's join when static."""
+        return cmd.joined if cmd.joined is not None else " ".join(args)
 
     def _get_numeric_value(self, value: str) -> float | int | None:
         """Converts a string to a float or int, returns None if not possible."""
-        try:
-            if "." in value:
-                return float(value)
-            return int(value)
-        except ValueError:
-            return None
+        return parse_number(value)
 
     def execute(self, source: str) -> None:
         """Executes a script from a source string."""
-        parser = Parser(source)
-        commands = parser.parse()
-
-        for cmd in commands:
-            # Substitute variables in arguments before executing the command
-            cmd.args = self._substitute_vars(cmd.args)
-
-            if cmd.name == "say":
-                print(" ".join(cmd.args))
-
-            elif cmd.name == "set":
-                if len(cmd.args) != 2:
-                    print(f"L{cmd.line_number}: 'set' requires 2 arguments.")
-                    continue
-                var_name, value = cmd.args
-                # Try to convert to number, otherwise store as string
-                numeric_value = self._get_numeric_value(value)
-                self.variables[var_name] = numeric_value if numeric_value is not None else value
-
-            elif cmd.name in ("add", "sub", "mul", "div"):
-                if len(cmd.args) != 2:
-                    print(f"L{cmd.line_number}: '{cmd.name}' requires 2 arguments.")
-                    continue
-                var_name, str_val = cmd.args
-                if var_name not in self.variables:
-                    print(f"L{cmd.line_number}: Variable '{var_name}' not found.")
-                    continue
-
-                val = self._get_numeric_value(str_val)
-                if val is None:
-                    print(f"L{cmd.line_number}: Second argument for '{cmd.name}' must be a number.")
-                    continue
-
-                if cmd.name == "add": self.variables[var_name] += val
-                elif cmd.name == "sub": self.variables[var_name] -= val
-                elif cmd.name == "mul": self.variables[var_name] *= val
-                elif cmd.name == "div": self.variables[var_name] /= val
-
-            elif cmd.name == "repeat":
-                if not cmd.args: continue
-                try:
-                    count = int(cmd.args[0])
-                except ValueError:
-                    count = 1
-                text = " ".join(cmd.args[1:])
-                for _ in range(max(count, 0)):
-                    print(text)
-
-            elif cmd.name == "wait":
-                if not cmd.args: continue
-                try:
-                    seconds = float(cmd.args[0])
-                except ValueError:
-                    seconds = 0.0
-                time.sleep(max(seconds, 0.0))
-
-            elif cmd.name == "window":
-                title = " ".join(cmd.args) or "Aila"
-                self.gui.create_window(title)
-                self.window_created = True
-
-            elif cmd.name == "label":
-                self._require_window()
-                self.gui.label(" ".join(cmd.args))
-
-            elif cmd.name == "input":
-                self._require_window()
-                self.gui.input(" ".join(cmd.args))
-
-            elif cmd.name == "button":
-                self._require_window()
-                text = " ".join(cmd.args) or "Button"
-                self.gui.button(text, on_click=lambda: None)
-
-            elif cmd.name == "show":
-                self._require_window()
-                self.gui.show(" ".join(cmd.args))
-
-            elif cmd.name == "start":
-                self._require_window()
-                self.gui.start()
+        program, errors = _compile_cached(source)
+        # The parse is cached, so report its syntax errors on every run here
+        for error in errors:
+            print(error)
+        if not program:
+            return
+        substitute_vars = self._substitute_vars
+
+        for op, cmd in program:
+            # Substitute variables into a local copy; the parsed command is never modified
+            if op(self, cmd, substitute_vars(cmd)) is _STOP:
                 break
 
-            elif cmd.name == "close":
-                self.gui.close()
+    def _say(self, cmd: AilaCommand, args: Sequence[str]) -> None:
+        print(self._text(cmd, args))
+
+    def _set(self, cmd: AilaCommand, args: Sequence[str]) -> None:
+        if len(args) != 2:
+            print(f"L{cmd.line_number}: 'set' requires 2 arguments.")
+            return
+        var_name, value = args
+        # Try to convert to number, otherwise store as string. Static args were
+        # already converted by the parser.
+        if cmd.typed_args is not None:
+            numeric_value = cmd.typed_args[1]
+        else:
+            numeric_value = self._get_numeric_value(value)
+        self.variables[var_name] = numeric_value if numeric_value is not None else value
+
+    def _arith(self, cmd: AilaCommand, args: Sequence[str]) -> None:
+        if len(args) != 2:
+            print(f"L{cmd.line_number}: '{cmd.name}' requires 2 arguments.")
+            return
+        var_name, str_val = args
+        try:
+            current = self.variables[var_name]
+        except KeyError:
+            print(f"L{cmd.line_number}: Variable '{var_name}' not found.")
+            return
+
+        val = cmd.typed_args[1] if cmd.typed_args is not None else self._get_numeric_value(str_val)
+        if val is None:
+            print(f"L{cmd.line_number}: Second argument for '{cmd.name}' must be a number.")
+            return
 
-            else:
-                print(f"L{cmd.line_number}: Unknown command '{cmd.name}'")
+        self.variables[var_name] = _ARITH_OPS[cmd.name](current, val)
 
+    def _repeat(self, cmd: AilaCommand, args: Sequence[str]) -> None:
+        if not args: return
+        try:
+            count = int(args[0])
+        except ValueError:
+            count = 1
+        _write_repeat(*_split_repeat(" ".join(args[1:]) + "\n", count))
 
+    def _wait(self, cmd: AilaCommand, args: Sequence[str]) -> None:
+        if not args: return
+        try:
+            seconds = float(args[0])
+        except ValueError:
+            seconds = 0.0
+        import time
+        time.sleep(max(seconds, 0.0))
+
+    def _window(self, cmd: AilaCommand, args: Sequence[str]) -> None:
+        # Static titles already carry the default from the parser
+        title = cmd.joined if cmd.joined is not None else " ".join(args) or "Aila"
+        self._require_gui().create_window(title)
+        self.window_created = True
+
+    def _label(self, cmd: AilaCommand, args: Sequence[str]) -> None:
+        self._require_window()
+        self.gui.label(self._text(cmd, args))
+
+    def _input(self, cmd: AilaCommand, args: Sequence[str]) -> None:
+        self._require_window()
+        self.gui.input(self._text(cmd, args))
+
+    def _button(self, cmd: AilaCommand, args: Sequence[str]) -> None:
+        self._require_window()
+        text = cmd.joined if cmd.joined is not None else " ".join(args) or "Button"
+        self.gui.button(text, on_click=_noop)
+
+    def _show(self, cmd: AilaCommand, args: Sequence[str]) -> None:
+        self._require_window()
+        self.gui.show(self._text(cmd, args))
+
+    def _start(self, cmd: AilaCommand, args: Sequence[str]) -> object:
+        self._require_window()
+        self.gui.start()
+        return _STOP
+
+    def _close(self, cmd: AilaCommand, args: Sequence[str]) -> None:
+        if self.gui is not None:
+            self.gui.close()
+
+    def _unknown(self, cmd: AilaCommand, args: Sequence[str]) -> None:
+        print(f"L{cmd.line_number}: Unknown command '{cmd.name}'")
+
+
+_HANDLERS: Dict[str, Op] = {
+    "say": AilaInterpreter._say,
+    "set": AilaInterpreter._set,
+    **{name: AilaInterpreter._arith for name in _ARITH_OPS},
+    "repeat": AilaInterpreter._repeat,
+    "wait": AilaInterpreter._wait,
+    "window": AilaInterpreter._window,
+    "label": AilaInterpreter._label,
+    "input": AilaInterpreter._input,
+    "button": AilaInterpreter._button,
+    "show": AilaInterpreter._show,
+    "start": AilaInterpreter._start,
+    "close": AilaInterpreter._close,
+}
+
+
+def _static_repeat(cmd: AilaCommand) -> Optional[Op]:
+    """Returns an op writing the precomputed output of a `repeat` with a literal count and text."""
+    if cmd.templates is not None or not cmd.args:
+        return None
+    try:
+        count = int(cmd.args[0])
+    except ValueError:
+        return None
+    output = _split_repeat(" ".join(cmd.args[1:]) + "\n", count)
+
+    def write_output(interpreter: "AilaInterpreter", cmd: AilaCommand, args: Sequence[str]) -> None:
+        _write_repeat(*output)
+
+    return write_output
+
+
+def _compile_program(commands: ParsedProgram) -> Tuple[Tuple[Op, AilaCommand], ...]:
+    """Lowers parsed commands into `(handler, command)` pairs, resolving each handler once."""
+    get_handler = _HANDLERS.get
+    unknown = AilaInterpreter._unknown
+    program = []
+    for cmd in commands:
+        op = _static_repeat(cmd) if cmd.name == "repeat" else None
+        program.append((op or get_handler(cmd.name, unknown), cmd))
+    return tuple(program)
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_cached(source: str) -> Tuple[Tuple[Tuple[Op, AilaCommand], ...], Tuple[str, ...]]:
+    """
+    Parses and compiles a script once; executing the same source again reuses the result.
+    Returns the compiled program and the script's syntax errors.
+    """
+    commands = Parser(source).parse(report_errors=False)
+    return _compile_program(commands), tuple(commands.errors)
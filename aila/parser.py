@@ -1,51 +1,115 @@
+import re
+import sys
 import shlex
-from typing import List
-from .ast import AilaCommand
+from typing import Optional, Tuple
+from .ast import Number, ParsedProgram
+
+# Matches a $varname reference inside an argument.
+_VAR_RE = re.compile(r'\$([a-zA-Z_][a-zA-Z0-9_]*)')
+
+# Matches one non-blank, non-comment line, capturing it without surrounding whitespace.
+_LINE_RE = re.compile(r'^[^\S\n]*([^#\s].*?)[^\S\n]*$', re.M)
+
+# Separators between tokens on a line without quotes; matches shlex, which only
+# splits on ASCII whitespace (str.split would also split on e.g. "\xa0").
+_SPACE_RE = re.compile(r'[ \t]+')
+
+# Line boundaries other than "\n" that str.splitlines recognises.
+_OTHER_BREAKS_RE = re.compile(r'[\r\v\f\x1c-\x1e\x85\u2028\u2029]')
+
+# Commands whose arguments are converted to numbers at run time.
+_NUMERIC_COMMANDS = frozenset({"set", "add", "sub", "mul", "div"})
+
+# Commands that use all of their arguments joined into one string.
+_TEXT_COMMANDS = frozenset({"say", "window", "label", "input", "button", "show"})
+
+# Text used by commands that fall back to a default when given no arguments.
+_TEXT_DEFAULTS = {"window": "Aila", "button": "Button"}
+
+
+def parse_number(value: str) -> Number:
+    """Converts a string to a float or int, returns None if not possible."""
+    try:
+        if "." in value:
+            return float(value)
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _format_templates(args: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+    """
+    Converts `$name` references into str.format_map templates (`{name}`),
+    escaping literal braces. Returns None when no argument references a variable.
+    """
+    if not any("$" in arg for arg in args):
+        return None
+    return tuple(
+        _VAR_RE.sub(r"{\1}", arg.replace("{", "{{").replace("}", "}}"))
+        for arg in args
+    )
 
 
 class Parser:
     """
     A simple parser for the Aila language.
     It tokenizes the source code on a line-by-line basis.
-    It uses shlex to handle quoted strings.
+    It uses shlex to handle quoted strings, and a plain split for lines without quotes.
     """
     def __init__(self, source: str):
         self.source = source
-        self.lines = source.splitlines()
 
-    def parse(self) -> List[AilaCommand]:
+    def parse(self, report_errors: bool = True) -> ParsedProgram:
         """
-        Parses the source code and returns a list of Aila commands.
+        Parses the source code and returns the program's commands.
+        Syntax errors are collected on the result and, if `report_errors` is set, printed.
         """
-        commands: List[AilaCommand] = []
-        for i, raw_line in enumerate(self.lines):
-            line = raw_line.strip()
-            line_number = i + 1
-
-            if not line or line.startswith("#"):
-                continue
+        commands = ParsedProgram()
+        commands_append = commands.append
+        source = self.source
+        if _OTHER_BREAKS_RE.search(source):
+            source = "\n".join(source.splitlines())
+        # The regex skips blank and comment lines in C; line numbers are
+        # advanced by counting the newlines skipped since the previous match.
+        line_number = 1
+        pos = 0
+        for match in _LINE_RE.finditer(source):
+            start = match.start()
+            line_number += source.count("\n", pos, start)
+            pos = start
+            line = match.group(1)
 
-            try:
-                parts = shlex.split(line)
-            except ValueError as e:
-                # Provide a more user-friendly error for unclosed quotes
-                if "No closing quotation" in str(e):
-                    print(f"Syntax Error at line {line_number}: Unclosed quote in line: '{line}'")
-                else:
-                    print(f"Syntax Error at line {line_number}: {e}")
-                continue # Skip malformed lines
+            if '"' not in line and "'" not in line and "\\" not in line:
+                # Nothing for shlex to interpret, so splitting on its whitespace gives the same tokens.
+                parts = _SPACE_RE.split(line)
+            else:
+                try:
+                    parts = shlex.split(line)
+                except ValueError as e:
+                    # Provide a more user-friendly error for unclosed quotes
+                    if "No closing quotation" in str(e):
+                        error = f"Syntax Error at line {line_number}: Unclosed quote in line: '{line}'"
+                    else:
+                        error = f"Syntax Error at line {line_number}: {e}"
+                    commands.errors.append(error)
+                    if report_errors:
+                        print(error)
+                    continue # Skip malformed lines
 
             if not parts:
                 continue
 
-            command_name = parts[0].lower()
-            args = parts[1:]
-
-            command = AilaCommand(
-                name=command_name,
-                args=args,
-                line_number=line_number
-            )
-            commands.append(command)
+            # Interning dedupes the small command vocabulary and makes
+            # later name comparisons pointer checks.
+            command_name = sys.intern(parts[0].lower())
+            args = tuple(parts[1:])
+            templates = _format_templates(args)
+            typed_args = joined = None
+            if templates is None:
+                if command_name in _NUMERIC_COMMANDS:
+                    typed_args = tuple(parse_number(arg) for arg in args)
+                elif command_name in _TEXT_COMMANDS:
+                    joined = " ".join(args) or _TEXT_DEFAULTS.get(command_name, "")
+            commands_append(command_name, args, line_number, templates, typed_args, joined)
 
         return commands
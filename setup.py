@@ -7,6 +7,7 @@ setup(
     install_requires=[
         "google-genai>=0.1.0",
         "ollama>=0.3.0",
+        "blake3>=0.3.0",
     ],
     entry_points={
         "console_scripts": [